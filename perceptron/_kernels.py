@@ -0,0 +1,246 @@
+"""
+Fast math helpers for finding similar memories without asking Neo4j.
+
+These are used when faiss is not installed. If numba is installed, the
+similarity loop is compiled to machine code and spread over all CPU cores;
+otherwise plain numpy does the same work.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from numba import njit, prange  # Optional: compiles the loop below
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True)
+    def _dots(E, q):
+        # One dot product per memory, rows split across CPU cores
+        out = np.empty(E.shape[0], dtype=np.float32)
+        for i in prange(E.shape[0]):
+            acc = np.float32(0.0)
+            for j in range(E.shape[1]):
+                acc += E[i, j] * q[j]
+            out[i] = acc
+        return out
+
+    @njit(parallel=True, fastmath=True)
+    def _dots_int8(Eq, qq):
+        # Same as _dots but on int8 numbers, added up in int32
+        out = np.empty(Eq.shape[0], dtype=np.int32)
+        for i in prange(Eq.shape[0]):
+            acc = np.int32(0)
+            for j in range(Eq.shape[1]):
+                acc += np.int32(Eq[i, j]) * np.int32(qq[j])
+            out[i] = acc
+        return out
+else:
+    def _dots(E, q):
+        return E @ q
+
+    _dots_int8 = None  # numpy has no fast int8 matmul, see _int8_scores()
+
+
+# Rows of int8 embeddings turned back into float32 at a time when numba is
+# missing; small enough to stay in CPU cache, big enough for BLAS to be fast.
+_BLOCK = 1024
+
+
+# Embeddings bigger than this keep the plain loop; writing out hundreds of
+# terms makes compiling slow and doesn't run any faster.
+_MAX_UNROLL = 64
+
+
+@lru_cache(maxsize=None)
+def make_dot_kernel(D):
+    """
+    Build a _dots() that only works for embeddings of size D, but faster.
+
+    The inner loop is written out in full (e.g. for D=3:
+    E[i, 0] * q[0] + E[i, 1] * q[1] + E[i, 2] * q[2]), so the compiler
+    knows the exact size and can use the widest CPU instructions. Built
+    once per size and then reused.
+
+    Args:
+        D (int): How many numbers each embedding has
+
+    Returns:
+        function: dots(E, q) -> one float32 score per row of E
+    """
+    if njit is None or D > _MAX_UNROLL:
+        return _dots
+
+    terms = " + ".join(f"E[i, {j}] * q[{j}]" for j in range(D))
+    src = (
+        "def dots(E, q):\n"
+        "    out = np.empty(E.shape[0], dtype=np.float32)\n"
+        "    for i in prange(E.shape[0]):\n"
+        f"        out[i] = {terms}\n"
+        "    return out\n"
+    )
+    namespace = {'np': np, 'prange': prange}
+    exec(src, namespace)
+    return njit(parallel=True, fastmath=True)(namespace['dots'])
+
+
+def quantize_rows(rows):
+    """
+    Turn float embeddings into int8 numbers plus one scale per row.
+
+    row ≈ q * scale, where q is in -127..127. This makes each embedding
+    4x smaller than float32, so scanning all memories reads 4x less memory.
+
+    Args:
+        rows (np.ndarray): float32 embeddings, shape (N, D)
+
+    Returns:
+        tuple: (q, scale) with q int8 of shape (N, D) and scale float32 of shape (N,)
+    """
+    scale = np.abs(rows).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0  # All-zero rows stay all zero
+    q = np.round(rows / scale[:, None]).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def _int8_dots_blocked(Eq, Qq):
+    # Integer dot products of the quantized queries Qq (held as float32)
+    # with every row of Eq, using float32 BLAS on a block of rows at a time
+    # instead of copying all of Eq to int32 for a slow integer matmul. Every
+    # partial sum is a whole number below 2**24 (for D up to ~1000), so the
+    # result is exactly what the numba int32 loop gives.
+    S = np.empty((Qq.shape[0], Eq.shape[0]), dtype=np.float32)
+    for start in range(0, Eq.shape[0], _BLOCK):
+        block = Eq[start:start + _BLOCK].astype(np.float32)
+        S[:, start:start + _BLOCK] = Qq @ block.T
+    return S
+
+
+def _int8_scores(Eq, scale, q):
+    # Dot product of the quantized q with every row of Eq, scaled back
+    qq, qs = quantize_rows(q[None, :])
+    if _dots_int8 is not None:
+        dots = _dots_int8(Eq, qq[0]).astype(np.float32)
+    else:
+        dots = _int8_dots_blocked(Eq, qq.astype(np.float32))[0]
+    return dots * (scale * qs[0])
+
+
+def _select(sims, k, thr):
+    # Pick the top k without sorting everything, then sort just those
+    if sims.shape[0] > k:
+        top = np.argpartition(-sims, k - 1)[:k]
+    else:
+        top = np.arange(sims.shape[0])
+    top = top[np.argsort(-sims[top])]
+
+    rows = [int(i) for i in top if sims[i] > thr]
+    return rows, [float(sims[i]) for i in rows]
+
+
+def topk_dot(E, q, k, thr, dots=_dots):
+    """
+    Find the k rows of E with the biggest dot product with q.
+
+    Args:
+        E (np.ndarray): One embedding per row, float32, shape (N, D)
+        q (np.ndarray): The query embedding, float32, shape (D,)
+        k (int): How many results to keep at most
+        thr (float): Only keep results with a score above this
+        dots (function): Scoring loop to use, e.g. from make_dot_kernel(D)
+
+    Returns:
+        tuple: (rows, scores) as lists, best match first
+    """
+    if E.shape[0] == 0:
+        return [], []
+
+    return _select(dots(E, q), k, thr)
+
+
+def topk_dot_int8(Eq, scale, q, k, thr):
+    """
+    Same as topk_dot, but for embeddings stored by quantize_rows().
+
+    The query is quantized too, the dot products are done on integers and
+    then scaled back, so scores are close to the float ones. Without numba
+    the integers are multiplied with float32 BLAS a block of rows at a time.
+
+    Args:
+        Eq (np.ndarray): int8 embeddings, shape (N, D)
+        scale (np.ndarray): float32 scale of each row, shape (N,)
+        q (np.ndarray): The query embedding, float32, shape (D,)
+        k (int): How many results to keep at most
+        thr (float): Only keep results with a score above this
+
+    Returns:
+        tuple: (rows, scores) as lists, best match first
+    """
+    if Eq.shape[0] == 0:
+        return [], []
+
+    return _select(_int8_scores(Eq, scale, q), k, thr)
+
+
+def _select_batch(S, k, thr):
+    # Same as _select, for every row of a (M, N) score matrix at once
+    if S.shape[1] > k:
+        top = np.argpartition(-S, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(S.shape[1]), S.shape)
+    top_sims = np.take_along_axis(S, top, axis=1)
+    order = np.argsort(-top_sims, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+    results = []
+    for rows, sims in zip(top, top_sims):
+        keep = sims > thr
+        results.append(([int(i) for i in rows[keep]], [float(x) for x in sims[keep]]))
+    return results
+
+
+def topk_dot_batch(E, Q, k, thr):
+    """
+    Run topk_dot for many queries with a single matrix multiply.
+
+    Args:
+        E (np.ndarray): One embedding per row, float32, shape (N, D)
+        Q (np.ndarray): One query per row, float32, shape (M, D)
+        k (int): How many results to keep at most per query
+        thr (float): Only keep results with a score above this
+
+    Returns:
+        list: One (rows, scores) tuple per query, best match first
+    """
+    if E.shape[0] == 0:
+        return [([], []) for _ in range(Q.shape[0])]
+
+    return _select_batch(Q @ E.T, k, thr)
+
+
+def topk_dot_int8_batch(Eq, scale, Q, k, thr):
+    """
+    Run topk_dot_int8 for many queries, one float32 matrix multiply per
+    block of rows. Scores are the same as topk_dot_int8 gives.
+
+    Args:
+        Eq (np.ndarray): int8 embeddings, shape (N, D)
+        scale (np.ndarray): float32 scale of each row, shape (N,)
+        Q (np.ndarray): One query per row, float32, shape (M, D)
+        k (int): How many results to keep at most per query
+        thr (float): Only keep results with a score above this
+
+    Returns:
+        list: One (rows, scores) tuple per query, best match first
+    """
+    if Eq.shape[0] == 0:
+        return [([], []) for _ in range(Q.shape[0])]
+
+    Qq, qs = quantize_rows(Q)
+    S = _int8_dots_blocked(Eq, Qq.astype(np.float32))
+    S *= qs[:, None] * scale[None, :]
+    return _select_batch(S, k, thr)
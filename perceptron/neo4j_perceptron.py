@@ -18,9 +18,160 @@ Example: If you teach it about "cats" and "dogs", and later ask about "pets",
 it should be able to find the related animal memories.
 """
 
-from neo4j import GraphDatabase
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from neo4j import READ_ACCESS, GraphDatabase
+import logging
 import numpy as np
+import os
 import random
+import threading
+import time
+
+try:
+    import faiss  # Optional: fast in-process similarity search
+except ImportError:
+    faiss = None
+
+try:
+    # Imported as part of the perceptron package
+    from ._kernels import (make_dot_kernel, quantize_rows, topk_dot, topk_dot_batch,
+                           topk_dot_int8, topk_dot_int8_batch)
+except ImportError:
+    # Run directly as a script (python neo4j_perceptron.py)
+    from _kernels import (make_dot_kernel, quantize_rows, topk_dot, topk_dot_batch,
+                          topk_dot_int8, topk_dot_int8_batch)
+
+log = logging.getLogger(__name__)
+
+# Search settings used by every search path (faiss, numpy/numba and Neo4j)
+TOP_K = 5              # Maximum results returned per query
+MIN_SIMILARITY = 0.5   # Minimum cosine similarity to count as a match
+
+
+def _normalize(vector):
+    """
+    Scale an embedding to length 1, so a dot product equals cosine similarity.
+
+    Args:
+        vector (list): Numbers that represent a memory or a query
+
+    Returns:
+        list: The same direction with length 1 (all-zero vectors are left as is)
+    """
+    a = np.asarray(vector, dtype='float32')
+    norm = np.sqrt(a.dot(a))  # About 2x faster than np.linalg.norm for one vector
+    return (a / norm).tolist() if norm > 0 else a.tolist()
+
+
+def _fingerprint(vector):
+    """
+    Round a normalized query to a hashable key for the search cache.
+
+    Queries that differ by less than about 1/1000 per number get the same
+    key, so repeated (or nearly repeated) questions reuse earlier answers.
+
+    Args:
+        vector (list): Normalized query numbers
+
+    Returns:
+        tuple: Whole numbers, 1024x the query rounded
+    """
+    return tuple(np.round(np.asarray(vector) * 1024).astype(np.int32).tolist())
+
+
+def _run_tx(tx, cypher, params=None):
+    """
+    Run one Cypher query inside a managed transaction and keep all records.
+
+    Used with session.execute_write / execute_read, which retry on temporary
+    errors and commit once at the end.
+
+    Args:
+        tx: An open transaction (given by execute_write / execute_read)
+        cypher (str): The query to run
+        params (dict): Query parameters
+
+    Returns:
+        list: All result records
+    """
+    return list(tx.run(cypher, params))
+
+
+def _merge_nodes(tx, nodes, with_vectors):
+    """
+    Create memory nodes that don't exist yet (existing ones are left alone).
+
+    The node itself only gets small values. When with_vectors is on, the
+    embedding is added with db.create.setNodeVectorProperty, which checks it
+    and stores it as a compact float array for the vector index. Searches
+    never read it in Cypher; the only query that returns it is
+    PerceptionStore.sync_from_graph(), which copies memories this process
+    doesn't have yet. When it's off, the embedding isn't stored in Neo4j at
+    all and only the in-process copy has it.
+
+    Args:
+        tx: An open write transaction
+        nodes (list): Rows like {'bundle_id': ..., 'embedding': [...]}
+        with_vectors (bool): Also store the embedding for the vector index
+    """
+    cypher = """
+        UNWIND $nodes AS n
+        MERGE (p:Perception {bundle_id: n.bundle_id})         // Unique ID for this memory
+        ON CREATE SET
+            p.activation_count = 0,          // How many times this memory was accessed
+            p.confidence = 0.5               // How confident we are about this memory
+    """
+    if with_vectors:
+        cypher += """
+        WITH p, n WHERE p.embedding IS NULL                    // Only new memories
+        CALL db.create.setNodeVectorProperty(p, 'embedding', n.embedding)
+    """
+    tx.run(cypher, {'nodes': nodes})
+
+
+def _save_neighbor_lists(tx, bundle_ids):
+    """
+    Copy each memory's outgoing connections onto the memory node itself.
+
+    Neo4j can't store a list of maps on a node, so this is two lists in the
+    same order: neighbor_ids and neighbor_weights. Reading them later needs
+    no extra MATCH over the RELATES edges.
+
+    Args:
+        tx: An open write transaction
+        bundle_ids (list): Memories whose connections changed
+
+    Returns:
+        dict: bundle_id -> [(neighbor_bundle_id, weight), ...]
+    """
+    result = tx.run("""
+        UNWIND $ids AS id
+        MATCH (p:Perception {bundle_id: id})
+        OPTIONAL MATCH (p)-[r:RELATES]->(q:Perception)
+        WITH p, collect(q.bundle_id) AS ids, collect(r.weight) AS weights
+        SET p.neighbor_ids = ids, p.neighbor_weights = weights
+        RETURN p.bundle_id AS bundle_id, ids, weights
+    """, {'ids': bundle_ids})
+    return {r['bundle_id']: list(zip(r['ids'], r['weights'])) for r in result}
+
+
+def _grow(array, used, size):
+    """
+    Copy the first `used` rows of an array into a new, bigger one.
+
+    Args:
+        array (np.ndarray): The array to grow
+        used (int): How many rows are filled in
+        size (int): How many rows the new array should have
+
+    Returns:
+        np.ndarray: New array with the same dtype and the old rows on top
+    """
+    bigger = np.empty((size,) + array.shape[1:], dtype=array.dtype)
+    bigger[:used] = array[:used]
+    return bigger
+
 
 class PerceptionStore:
     """
@@ -28,19 +179,502 @@ class PerceptionStore:
     Think of it as the brain's memory storage system.
     """
     
-    def __init__(self, neo4j_uri, auth):
+    def __init__(self, neo4j_uri, auth, embedding_dim=None, cache_path=None,
+                 quantize=False, flush_interval=0.1, pool_size=32,
+                 warm_connections=4, graph_vectors=True, sync_interval=1.0,
+                 save_interval=30.0):
         """
         Initialize the connection to Neo4j database.
         
         Args:
             neo4j_uri (str): Database connection string (e.g., "bolt://localhost:7687")
             auth (tuple): Username and password tuple (e.g., ("neo4j", "password"))
+            embedding_dim (int): How many numbers each embedding has (e.g., 3).
+                If not given, it is taken from the first memory we store.
+            cache_path (str): Optional file to save the in-process embedding
+                copy to (numpy .npz format, written to exactly this path), so
+                a restart doesn't need to reload it from Neo4j. Loaded on
+                startup if it already exists.
+            quantize (bool): Keep the in-process embeddings as int8 with one
+                scale per memory (4x less memory to scan, scores change very
+                slightly). Searching is then done without faiss.
+            flush_interval (float): Seconds between background writes of
+                activation counts to Neo4j.
+            pool_size (int): Most connections kept open to Neo4j at once
+                (enough for several trainers or test threads in parallel).
+            warm_connections (int): How many connections to open right away,
+                so the first queries don't wait for connecting and logging in.
+            graph_vectors (bool): Also keep embeddings in Neo4j's vector index.
+                Turn off to keep nodes small and search only the in-process
+                copy; then cache_path is required, since Neo4j no longer has
+                the embeddings to rebuild it from.
+            sync_interval (float): Seconds between checks for memories that
+                other processes added to Neo4j, so searches see them too.
+            save_interval (float): Seconds between saves of the in-process
+                copy to cache_path (only when something changed). It is also
+                saved on close().
+
+        Raises:
+            ValueError: If graph_vectors is False and cache_path is None
+        """
+        if not graph_vectors and cache_path is None:
+            raise ValueError("graph_vectors=False needs a cache_path, otherwise "
+                             "the embeddings are lost when the process exits")
+
+        # In-process copy of the embeddings for fast search: one contiguous
+        # float32 matrix, row i belongs to the memory self._ids[i]. Only the
+        # first self._n rows are used, the rest is room to grow. If faiss is
+        # installed, self._index holds the same rows and does the searching.
+        # With quantize=True, self._E is int8 and self._scale has one scale
+        # per row.
+        self._index = None
+        self._E = None
+        self._scale = None
+        self._quantize = quantize
+        self._n = 0
+        self._D = None      # Embedding size, known after the first memory
+        self._dot = None    # Scoring loop built for exactly self._D numbers
+        self._ids = []
+        self._rows = {}     # bundle_id -> row, to skip memories we already have
+        self._cache_path = cache_path
+        self._cache_dirty = False   # Rows added since the last save
+        # Searches read the copy while new memories (ours, or ones found in
+        # Neo4j by the background thread) are added to it
+        self._mirror_lock = threading.RLock()
+
+        # Outgoing connections of each memory stored by this process:
+        # bundle_id -> [(neighbor_bundle_id, weight), ...]
+        self._neighbors = {}
+
+        # Remember the answers to the last 1024 different queries, keyed by
+        # _fingerprint(): fingerprint -> answer, oldest first. Cleared
+        # whenever new memories are added.
+        self._search_cache = OrderedDict()
+        self._search_cache_size = 1024
+
+        # Activation counts waiting to be written: bundle_id -> hits.
+        # Searches only add to this; a background thread writes them all to
+        # Neo4j with one query every flush_interval seconds. The same thread
+        # pulls in memories other processes stored, every sync_interval, and
+        # saves the cache file every save_interval.
+        self._pending_hits = Counter()
+        self._hits_lock = threading.Lock()
+        self._stop_flusher = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop,
+                                         args=(flush_interval, sync_interval,
+                                               save_interval),
+                                         daemon=True)
+
+        # The vector index needs to know the embedding size up front
+        self._graph_vectors = graph_vectors
+        self._vector_dim = None
+
+        log.info("🧠 Connecting to Neo4j brain database...")
+        self.driver = GraphDatabase.driver(
+            neo4j_uri, auth=auth,
+            max_connection_pool_size=pool_size,   # Connections shared by all sessions
+            connection_acquisition_timeout=30,    # Seconds to wait for a free one
+            keep_alive=True,                      # Don't let idle ones get dropped
+        )
+        try:
+            self._warm_pool(warm_connections)
+            log.info("✅ Connected successfully!")
+
+            # Make bundle_id unique. This also gives Neo4j an index on it, so
+            # every MATCH (p:Perception {bundle_id: ...}) is a fast lookup
+            # instead of scanning all memories.
+            with self.driver.session() as session:
+                session.execute_write(_run_tx, """
+                    CREATE CONSTRAINT perception_bundle_id IF NOT EXISTS
+                    FOR (p:Perception) REQUIRE p.bundle_id IS UNIQUE
+                """)
+
+            if cache_path is not None and os.path.exists(cache_path):
+                self._load_cache()
+            # Searches only look at the in-process copy once it has anything
+            # in it, so it must start with every memory already in Neo4j
+            self.sync_from_graph()
+
+            if embedding_dim is not None:
+                self._ensure_vector_index(embedding_dim)
+
+            # Last, so a failed setup never leaves the thread running
+            self._flusher.start()
+        except Exception:
+            # Don't leave a half-built store holding connections
+            self.driver.close()
+            raise
+
+    def _warm_pool(self, count):
+        """
+        Open `count` connections now and put them back in the pool.
+
+        Each session holds an open transaction until all of them are
+        running, otherwise the driver would just reuse one connection.
+
+        Args:
+            count (int): How many connections to open
+        """
+        sessions = [self.driver.session() for _ in range(count)]
+        try:
+            transactions = [s.begin_transaction() for s in sessions]
+            for tx in transactions:
+                tx.run("RETURN 1").consume()
+            for tx in transactions:
+                tx.close()
+        finally:
+            for s in sessions:
+                s.close()
+
+    def _session(self, session=None):
+        """
+        Use the caller's session if one was given, otherwise open a new one.
+
+        Args:
+            session: An open Neo4j session, or None
+
+        Returns:
+            A context manager to use in a `with` block
+        """
+        return nullcontext(session) if session is not None else self.driver.session()
+
+    def _ensure_vector_index(self, dimensions, session=None):
+        """
+        Create the vector index used to find similar memories (only once).
+
+        Neo4j keeps the embeddings in an HNSW index, so a similarity search
+        only compares against a few candidates instead of every memory.
+
+        Args:
+            dimensions (int): How many numbers each embedding has
+            session: Optional open session to reuse
+        """
+        if self._vector_dim == dimensions:
+            return  # Already created
+        if not self._graph_vectors:
+            return  # Embeddings aren't kept in Neo4j, nothing to index
+
+        with self._session(session) as session:
+            # Index options can't be parameters, so the size is written in
+            session.execute_write(_run_tx, f"""
+                CREATE VECTOR INDEX perception_emb IF NOT EXISTS
+                FOR (p:Perception) ON (p.embedding)
+                OPTIONS {{indexConfig: {{
+                    `vector.dimensions`: {int(dimensions)},
+                    `vector.similarity_function`: 'cosine'
+                }}}}
+            """)
+            # Wait until the index is ready to answer queries
+            session.execute_read(_run_tx, "CALL db.awaitIndex('perception_emb')")
+
+        self._vector_dim = dimensions
+
+    def _vector_index_exists(self):
+        """
+        Check whether the perception_emb vector index exists yet.
+
+        It is only created once the embedding size is known (embedding_dim,
+        or the first stored memory), possibly by another process.
+
+        Returns:
+            bool: True if searches can use the index
+        """
+        if self._vector_dim is not None:
+            return True  # Created by this process
+
+        with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            records = session.execute_read(_run_tx, """
+                SHOW INDEXES YIELD name WHERE name = 'perception_emb'
+                RETURN count(*) AS n
+            """)
+        return records[0]['n'] > 0
+
+    def _remember_embeddings(self, bundle_ids, embeddings):
+        """
+        Add freshly stored memories to the in-process search copy.
+
+        Args:
+            bundle_ids (list): Memory names, in the same order as embeddings
+            embeddings (list): The numbers for each memory
+        """
+        with self._mirror_lock:
+            # Like the MERGE in Neo4j: a memory we already have keeps its first
+            # embedding, so it doesn't show up twice in search results
+            new = {}
+            for bundle_id, embedding in zip(bundle_ids, embeddings):
+                if bundle_id not in self._rows and bundle_id not in new:
+                    new[bundle_id] = embedding
+            if not new:
+                return
+            bundle_ids = list(new)
+
+            rows = np.asarray(list(new.values()), dtype='float32')
+            if self._E is None:
+                self._D = rows.shape[1]
+                self._dot = make_dot_kernel(self._D)
+                if self._quantize:
+                    self._E = np.empty((0, rows.shape[1]), dtype=np.int8)
+                    self._scale = np.empty(0, dtype=np.float32)
+                else:
+                    self._E = np.empty((0, rows.shape[1]), dtype=np.float32)
+                    if faiss is not None:
+                        # Inner product on length-1 vectors = cosine similarity
+                        self._index = faiss.IndexFlatIP(rows.shape[1])
+
+            # Grow in big steps (double the room) so adding memories one at a
+            # time doesn't copy the whole matrix every time
+            needed = self._n + rows.shape[0]
+            if needed > self._E.shape[0]:
+                room = max(needed, 2 * self._E.shape[0], 64)
+                self._E = _grow(self._E, self._n, room)
+                if self._scale is not None:
+                    self._scale = _grow(self._scale, self._n, room)
+
+            if self._quantize:
+                self._E[self._n:needed], self._scale[self._n:needed] = quantize_rows(rows)
+            else:
+                self._E[self._n:needed] = rows
+            self._rows.update((bundle_id, self._n + i) for i, bundle_id in enumerate(bundle_ids))
+            self._n = needed
+            self._ids.extend(bundle_ids)
+            if self._index is not None:
+                self._index.add(rows)
+            self._search_cache.clear()   # Old answers may miss the new memories
+            self._cache_dirty = True     # Saved later by the background thread
+
+    def save_cache(self):
+        """Save the in-process embedding copy to cache_path."""
+        if self._cache_path is None or self._E is None:
+            return
+
+        # Take a snapshot, so searches don't wait for the disk
+        with self._mirror_lock:
+            arrays = {'embeddings': self._E[:self._n].copy(),
+                      'ids': np.asarray(self._ids, dtype=str)}
+            if self._scale is not None:
+                arrays['scales'] = self._scale[:self._n].copy()
+            self._cache_dirty = False
+
+        # Write through a file handle (np.savez would add ".npz" to a plain
+        # path) and swap it in at the end, so a crash never leaves half a file
+        tmp_path = self._cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self._cache_path)
+
+    def sync_from_graph(self):
+        """
+        Add memories that are in Neo4j but not yet in the in-process copy.
+
+        Covers memories stored before this process started and ones stored
+        by other processes since. A cheap count is checked first, so this
+        usually costs one small query. Memories deleted from Neo4j by someone
+        else are not noticed (use clear() to start over).
         """
-        print("🧠 Connecting to Neo4j brain database...")
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=auth)
-        print("✅ Connected successfully!")
+        if not self._graph_vectors:
+            return  # Neo4j has no embeddings to load
+
+        with self.driver.session() as session:
+            total = session.execute_read(_run_tx, """
+                MATCH (p:Perception) RETURN count(p) AS n
+            """)[0]['n']
+            if total <= self._n:
+                return  # Nothing new
+
+            records = session.execute_read(_run_tx, """
+                MATCH (p:Perception)
+                WHERE p.embedding IS NOT NULL AND NOT p.bundle_id IN $known
+                RETURN p.bundle_id AS bundle_id, p.embedding AS embedding
+            """, {'known': list(self._rows)})
+
+        if records:
+            log.info("📥 Loading %d memories from Neo4j", len(records))
+            # Older code (and other writers) may have stored raw vectors;
+            # searches assume every row has length 1
+            self._remember_embeddings([r['bundle_id'] for r in records],
+                                      [_normalize(r['embedding']) for r in records])
+
+    def clear(self):
+        """Delete every memory, in Neo4j and in the in-process copy."""
+        with self.driver.session() as session:
+            session.execute_write(_run_tx, "MATCH (p:Perception) DETACH DELETE p")
+
+        with self._mirror_lock:
+            self._index = None
+            self._E = None
+            self._scale = None
+            self._n = 0
+            self._ids = []
+            self._rows = {}
+            self._neighbors = {}
+            self._search_cache.clear()
+            self._cache_dirty = False
+            if self._cache_path is not None and os.path.exists(self._cache_path):
+                os.remove(self._cache_path)
+        with self._hits_lock:
+            self._pending_hits.clear()
+
+    def _load_cache(self):
+        """Load the in-process embedding copy saved by save_cache()."""
+        log.info("📂 Loading cached embeddings from %s", self._cache_path)
+        # Read everything and close the file, so save_cache() and clear()
+        # can replace or delete it later (Windows won't while it's open)
+        with np.load(self._cache_path) as data:
+            E = data['embeddings']
+            scale = data['scales'] if 'scales' in data else None
+            ids = data['ids'].tolist()
+
+        # The file may have been saved with the other quantize setting;
+        # convert it so this store works the way it was asked to
+        if self._quantize and scale is None:
+            E, scale = quantize_rows(E.astype(np.float32))
+            self._cache_dirty = True
+        elif not self._quantize and scale is not None:
+            E, scale = E.astype(np.float32) * scale[:, None], None
+            self._cache_dirty = True
+
+        self._E = np.ascontiguousarray(E)
+        self._scale = None if scale is None else np.ascontiguousarray(scale)
+        self._n = self._E.shape[0]
+        self._ids = ids
+        self._rows = {bundle_id: i for i, bundle_id in enumerate(self._ids)}
+        self._D = self._E.shape[1]
+        self._dot = make_dot_kernel(self._D)
+        if not self._quantize and faiss is not None:
+            self._index = faiss.IndexFlatIP(self._D)
+            self._index.add(self._E)
+
+    def _search(self, query_embedding):
+        """
+        Search the in-process copy, reusing the answer to a recent query
+        with the same fingerprint.
+
+        Args:
+            query_embedding (list): Normalized query numbers
+
+        Returns:
+            tuple: (bundle_id, similarity) pairs, best match first
+        """
+        key = _fingerprint(query_embedding)
+        with self._mirror_lock:
+            answer = self._search_cache.get(key)
+            if answer is not None:
+                self._search_cache.move_to_end(key)   # Recently used again
+                return answer
+
+            # Search with the real query; the fingerprint is only the key
+            answer = self._search_local(query_embedding)
+            self._search_cache[key] = answer
+            if len(self._search_cache) > self._search_cache_size:
+                self._search_cache.popitem(last=False)   # Drop the oldest
+            return answer
+
+    def _search_local(self, query_embedding):
+        """
+        Search the in-process copy for a query.
+
+        Args:
+            query_embedding (list): Normalized query numbers
+
+        Returns:
+            tuple: (bundle_id, similarity) pairs, best match first
+        """
+        query_embedding = np.asarray(query_embedding, dtype='float32')
+        with self._mirror_lock:
+            if self._index is not None:
+                scores, rows = self._index.search(query_embedding[None, :], TOP_K)
+                memories = [{'bundle_id': self._ids[row], 'similarity': float(score)}
+                            for score, row in zip(scores[0], rows[0])
+                            if row >= 0 and score > MIN_SIMILARITY]   # -1 = not enough memories
+            else:
+                memories = self._local_activate(query_embedding)
+        return tuple((m['bundle_id'], m['similarity']) for m in memories)
+
+    def _local_activate(self, query_embedding):
+        """
+        Find similar memories in self._E (used when faiss is not installed).
+
+        All memories are scored with one pass over the contiguous matrix.
+
+        Args:
+            query_embedding (list): Normalized query numbers
+
+        Returns:
+            list: Up to TOP_K similar memories, best match first
+        """
+        query = np.asarray(query_embedding, dtype='float32')
+        if self._quantize:
+            rows, scores = topk_dot_int8(self._E[:self._n], self._scale[:self._n],
+                                         query, TOP_K, MIN_SIMILARITY)
+        else:
+            rows, scores = topk_dot(self._E[:self._n], query, TOP_K, MIN_SIMILARITY,
+                                    self._dot)
+        return [{'bundle_id': self._ids[row], 'similarity': score}
+                for row, score in zip(rows, scores)]
+
+    def _record_activations(self, bundle_ids):
+        """
+        Add 1 to the activation count of each given memory.
+
+        This doesn't wait for Neo4j: the hits are queued and written later
+        by flush_activations().
+
+        Args:
+            bundle_ids (list): Names of the memories that were found. A name
+                that appears twice gets +2.
+        """
+        with self._hits_lock:
+            self._pending_hits.update(bundle_ids)
+
+    def flush_activations(self):
+        """Write all queued activation counts to Neo4j with one query."""
+        with self._hits_lock:
+            hits, self._pending_hits = self._pending_hits, Counter()
+        if not hits:
+            return
+
+        rows = [{'id': bundle_id, 'n': n} for bundle_id, n in hits.items()]
+        try:
+            with self.driver.session() as session:
+                session.execute_write(_run_tx, """
+                    UNWIND $rows AS r
+                    MATCH (p:Perception {bundle_id: r.id})
+                    SET p.activation_count = p.activation_count + r.n
+                """, {'rows': rows})
+        except Exception:
+            # Put the hits back so the next flush tries again
+            with self._hits_lock:
+                self._pending_hits.update(hits)
+            raise
+
+    def _flush_loop(self, interval, sync_interval, save_interval):
+        """
+        Background thread: flush activation counts every `interval` seconds,
+        look for new memories in Neo4j every `sync_interval` seconds and save
+        the cache file every `save_interval` seconds.
+        """
+        last_sync = last_save = time.monotonic()
+        while not self._stop_flusher.wait(interval):
+            try:
+                self.flush_activations()
+            except Exception as e:
+                log.warning("⚠️ Could not save activation counts yet: %s", e)
+
+            if time.monotonic() - last_sync >= sync_interval:
+                last_sync = time.monotonic()
+                try:
+                    self.sync_from_graph()
+                except Exception as e:
+                    log.warning("⚠️ Could not check Neo4j for new memories: %s", e)
+
+            if self._cache_dirty and time.monotonic() - last_save >= save_interval:
+                last_save = time.monotonic()
+                try:
+                    self.save_cache()
+                except Exception as e:
+                    log.warning("⚠️ Could not save the embedding cache: %s", e)
     
-    def store_perception(self, bundle_id, embeddings, relations):
+    def store_perception(self, bundle_id, embeddings, relations, session=None):
         """
         Store a new perception (memory) in the graph database.
         
@@ -48,77 +682,251 @@ class PerceptionStore:
             bundle_id (str): Unique name for this memory (e.g., "visual_cat")
             embeddings (list): Numbers that represent the memory [0.8, 0.2, 0.9]
             relations (list): List of connections to other memories
+            session: Optional open session to reuse, so many calls don't each
+                pay for opening a new one
         
         Example:
             store_perception("cat_memory", [0.8, 0.2, 0.9], 
                            [{"target": "animal_memory", "weight": 0.9}])
         """
-        print(f"💾 Storing memory: {bundle_id}")
+        log.debug("💾 Storing memory: %s", bundle_id)
+        embeddings = _normalize(embeddings)   # Length 1, so dot product = cosine
         
-        with self.driver.session() as session:
-            # Step 1: Create the memory node in the graph
-            session.run("""
-                CREATE (p:Perception {
-                    bundle_id: $bundle_id,           // Unique ID for this memory
-                    embedding: $embedding,           // The numbers that represent this memory
-                    activation_count: 0,             // How many times this memory was accessed
-                    confidence: 0.5                  // How confident we are about this memory
-                })
-            """, {'bundle_id': bundle_id, 'embedding': embeddings})
+        def _write(tx):
+            # Step 1: Create the memory node in the graph (storing the same
+            # memory again keeps the first one instead of making a copy)
+            _merge_nodes(tx, [{'bundle_id': bundle_id, 'embedding': embeddings}],
+                         self._graph_vectors)
             
             # Step 2: Create connections to other memories
             for rel in relations:
-                session.run("""
+                tx.run("""
                     MATCH (p1:Perception {bundle_id: $bundle_id})      // Find our memory
                     MATCH (p2:Perception {bundle_id: $target})         // Find target memory
-                    CREATE (p1)-[:RELATES {weight: $weight}]->(p2)     // Connect them
+                    MERGE (p1)-[r:RELATES]->(p2)                       // Connect them (once)
+                    ON CREATE SET r.weight = $weight
                 """, {
                     'bundle_id': bundle_id,
                     'target': rel['target'],
                     'weight': rel['weight']  # How strong is this connection (0.0 to 1.0)
                 })
+            
+            # Step 3: Keep a copy of the connections on the node
+            return _save_neighbor_lists(tx, [bundle_id])
         
-        print(f"✅ Memory {bundle_id} stored with {len(relations)} connections")
+        with self._session(session) as session:
+            self._ensure_vector_index(len(embeddings), session)
+            # Node and connections are committed together in one transaction
+            neighbors = session.execute_write(_write)
+        
+        self._neighbors.update(neighbors)
+        self._remember_embeddings([bundle_id], [embeddings])
+        log.debug("✅ Memory %s stored with %d connections", bundle_id, len(relations))
     
+    def store_perceptions_bulk(self, items, session=None):
+        """
+        Store many perceptions (memories) at once.
+
+        Instead of one query per memory and one per connection, all
+        memories go in with a single UNWIND query and all connections with a
+        second one, both inside one write transaction. Connections can point
+        at any memory in the same batch, no matter the order.
+
+        Args:
+            items (list): Memories shaped like the training data, e.g.
+                {'id': 'visual_cat', 'embedding': [0.8, 0.2, 0.9],
+                 'relations': [{'target': 'visual_animal', 'weight': 0.9}]}
+            session: Optional open session to reuse
+        """
+        # Flatten the memories into plain parameter rows for UNWIND
+        # (embeddings are scaled to length 1, so dot product = cosine)
+        nodes = [{'bundle_id': item['id'], 'embedding': _normalize(item['embedding'])}
+                 for item in items]
+        rels = [{'src': item['id'], 'tgt': rel['target'], 'weight': rel['weight']}
+                for item in items
+                for rel in item['relations']]
+
+        log.debug("💾 Storing %d memories with %d connections", len(nodes), len(rels))
+
+        def _write(tx):
+            # Step 1: Create every memory node in one go (memories that
+            # already exist are left as they are)
+            _merge_nodes(tx, nodes, self._graph_vectors)
+
+            # Step 2: Create every connection in one go
+            tx.run("""
+                UNWIND $rels AS r
+                MATCH (a:Perception {bundle_id: r.src})            // Find our memory
+                MATCH (b:Perception {bundle_id: r.tgt})            // Find target memory
+                MERGE (a)-[rel:RELATES]->(b)                       // Connect them (once)
+                ON CREATE SET rel.weight = r.weight
+            """, {'rels': rels})
+
+            # Step 3: Keep a copy of the connections on each node
+            return _save_neighbor_lists(tx, sorted({r['src'] for r in rels}))
+
+        with self._session(session) as session:
+            if nodes:
+                self._ensure_vector_index(len(nodes[0]['embedding']), session)
+            neighbors = session.execute_write(_write)
+
+        self._neighbors.update(neighbors)
+        self._remember_embeddings([n['bundle_id'] for n in nodes],
+                                  [n['embedding'] for n in nodes])
+        log.debug("✅ Stored %d memories", len(nodes))
+
+    def neighbors(self, bundle_id):
+        """
+        Get the memories a memory is connected to, without asking Neo4j.
+
+        Only knows about memories stored by this process.
+
+        Args:
+            bundle_id (str): Name of the memory
+
+        Returns:
+            list: (neighbor_bundle_id, weight) pairs, empty if none
+        """
+        return self._neighbors.get(bundle_id, [])
+
+    @contextmanager
+    def _streamed_read(self, cypher, params):
+        """
+        Run a read query and hand back its result without loading it all.
+
+        The session stays open until the `with` block ends, so records are
+        pulled from Neo4j one by one as they are used.
+
+        Args:
+            cypher (str): The query to run
+            params (dict): Query parameters
+
+        Yields:
+            The query result, to loop over inside the `with` block
+        """
+        with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            with session.begin_transaction() as tx:
+                yield tx.run(cypher, params)
+
     def activate_perceptions(self, query_embedding):
         """
         Find memories similar to the given query.
         This is like asking the brain "what do you remember about this?"
         
+        Results come out one at a time (best match first), so a caller that
+        only needs the top match can stop early. A memory's activation count
+        goes up when it is handed out.
+        
         Args:
             query_embedding (list): Numbers representing what we're looking for
             
-        Returns:
-            list: List of similar memories with their similarity scores
+        Yields:
+            dict: A similar memory with its similarity score
         """
-        print("🔍 Searching for similar memories...")
+        log.debug("🔍 Searching for similar memories...")
+        query_embedding = _normalize(query_embedding)   # Match the stored memories
+        found = 0
         
-        with self.driver.session() as session:
-            # Use mathematical similarity to find matching memories
-            result = session.run("""
-                MATCH (p:Perception)
-                WITH p, 
-                     // Calculate similarity using dot product (mathematical similarity)
-                     reduce(dot = 0.0, i IN range(0, size(p.embedding)-1) | 
-                           dot + p.embedding[i] * $query[i]) as similarity
-                WHERE similarity > 0.5                                   // Only get good matches
-                SET p.activation_count = p.activation_count + 1          // Count this access
-                RETURN p.bundle_id, similarity
-                ORDER BY similarity DESC                                 // Best matches first
-                LIMIT 5                                                  // Only top 5 results
-            """, {'query': query_embedding})
+        if self._ids:
+            # Fast path: search the in-process copy (or reuse a cached
+            # answer), no Neo4j query needed
+            for bundle_id, similarity in self._search(query_embedding):
+                # Count the access (written to Neo4j in the background)
+                self._record_activations([bundle_id])
+                found += 1
+                yield {'bundle_id': bundle_id, 'similarity': similarity}
             
-            # Convert database results to Python list
-            memories = [{'bundle_id': r['p.bundle_id'], 'similarity': r['similarity']} 
-                       for r in result]
+            log.debug("🎯 Found %d similar memories", found)
+            return
+        
+        if not self._graph_vectors:
+            log.warning("⚠️ No embeddings in memory and none in Neo4j, nothing to search")
+            return
+
+        if not self._vector_index_exists():
+            log.debug("🎯 Nothing stored yet, no memories to find")
+            return
+        
+        # Ask the vector index for the TOP_K closest memories. They already
+        # come out best first, so the only thing left is dropping weak ones.
+        # Neo4j reports cosine scores as (1 + cosine) / 2, so the cutoff is
+        # converted to that scale and the score back to a cosine.
+        with self._streamed_read("""
+            CALL db.index.vector.queryNodes('perception_emb', $k, $query)
+            YIELD node AS p, score
+            WITH p, score WHERE score > $min_score                   // Only get good matches
+            RETURN p.bundle_id, 2 * score - 1 AS similarity
+        """, {'query': query_embedding, 'k': TOP_K,
+              'min_score': (1 + MIN_SIMILARITY) / 2}) as result:
+            for r in result:
+                # Count the access (written to Neo4j in the background)
+                self._record_activations([r['p.bundle_id']])
+                found += 1
+                yield {'bundle_id': r['p.bundle_id'], 'similarity': r['similarity']}
+        
+        log.debug("🎯 Found %d similar memories", found)
+    
+    def activate_perceptions_batch(self, queries):
+        """
+        Find similar memories for many queries at once.
+
+        All queries are scored against all memories with one matrix multiply,
+        and the activation counts are updated with one Neo4j query.
+
+        Args:
+            queries (list): One list of numbers per query
+
+        Returns:
+            list: For each query, a list of similar memories (best first)
+        """
+        log.debug("🔍 Searching for similar memories for %d queries...", len(queries))
+        if not queries:
+            return []
+        
+        if not self._ids:
+            # Nothing in the in-process copy (Neo4j had no embeddings at the
+            # last sync), ask Neo4j one query at a time
+            return [list(self.activate_perceptions(q)) for q in queries]
+        
+        Q = np.asarray([_normalize(q) for q in queries], dtype='float32')
+        with self._mirror_lock:
+            if self._index is not None:
+                scores, rows = self._index.search(Q, TOP_K)
+                hits = [([int(r) for r, sc in zip(row, score)
+                          if r >= 0 and sc > MIN_SIMILARITY],
+                         [float(sc) for r, sc in zip(row, score)
+                          if r >= 0 and sc > MIN_SIMILARITY])
+                        for row, score in zip(rows, scores)]
+            elif self._quantize:
+                hits = topk_dot_int8_batch(self._E[:self._n], self._scale[:self._n], Q,
+                                           TOP_K, MIN_SIMILARITY)
+            else:
+                hits = topk_dot_batch(self._E[:self._n], Q, TOP_K, MIN_SIMILARITY)
             
-            print(f"🎯 Found {len(memories)} similar memories")
-            return memories
+            results = [[{'bundle_id': self._ids[row], 'similarity': score}
+                        for row, score in zip(rows, scores)]
+                       for rows, scores in hits]
+        
+        # Count all accesses (written to Neo4j in the background)
+        self._record_activations([m['bundle_id'] for memories in results for m in memories])
+        
+        log.debug("🎯 Found %d similar memories in total", sum(len(m) for m in results))
+        return results
     
     def close(self):
         """Close the database connection cleanly."""
-        print("🔌 Closing database connection...")
-        self.driver.close()
+        log.info("🔌 Closing database connection...")
+        # Stop the background writer and save any activation counts left
+        self._stop_flusher.set()
+        self._flusher.join()
+        try:
+            try:
+                self.flush_activations()
+            finally:
+                if self._cache_dirty:
+                    self.save_cache()
+        finally:
+            self.driver.close()
 
 
 class PerceptionTrainer:
@@ -135,7 +943,7 @@ class PerceptionTrainer:
             perception_store (PerceptionStore): The brain storage system
         """
         self.store = perception_store
-        print("👨‍🏫 Trainer initialized!")
+        log.info("👨‍🏫 Trainer initialized!")
     
     def train(self, training_data):
         """
@@ -144,22 +952,16 @@ class PerceptionTrainer:
         Args:
             training_data (list): List of memories to store
         """
-        print("🎓 Training started...")
-        print(f"📚 Will store {len(training_data)} memories")
+        log.info("🎓 Training started...")
+        log.info("📚 Will store %d memories", len(training_data))
         
-        for i, data in enumerate(training_data):
-            # Store each memory one by one
-            self.store.store_perception(
-                bundle_id=data['id'],           # Memory name
-                embeddings=data['embedding'],   # Memory numbers
-                relations=data['relations']     # Memory connections
-            )
-            
-            # Show progress every 10 memories
-            if i % 10 == 0:
-                print(f"📖 Stored {i+1} memories...")
+        # Store all memories in one batch (2 queries total instead of
+        # one query per memory plus one per connection), on one session
+        # and committed as one transaction
+        with self.store.driver.session() as session:
+            self.store.store_perceptions_bulk(training_data, session=session)
         
-        print("🎉 Training completed!")
+        log.info("🎉 Training completed!")
     
     def test(self, test_queries):
         """
@@ -171,24 +973,25 @@ class PerceptionTrainer:
         Returns:
             float: Average accuracy score (0.0 to 1.0)
         """
-        print("🧪 Testing started...")
+        log.info("🧪 Testing started...")
         results = []
         
-        for query in test_queries:
-            print(f"❓ Testing: {query['name']}")
-            
-            # Ask the brain to find similar memories
-            activated = self.store.activate_perceptions(query['embedding'])
+        # Ask the brain about all queries at once
+        all_activated = self.store.activate_perceptions_batch(
+            [query['embedding'] for query in test_queries])
+        
+        for query, activated in zip(test_queries, all_activated):
+            log.debug("❓ Testing: %s", query['name'])
             
             # Check if we got the right answer
             accuracy = self._calculate_accuracy(activated, query['expected'])
             results.append(accuracy)
             
-            print(f"📊 Result: {accuracy:.2f} accuracy")
+            log.debug("📊 Result: %.2f accuracy", accuracy)
         
         # Calculate overall performance
         avg_accuracy = sum(results) / len(results)
-        print(f"🏆 Overall Performance: {avg_accuracy:.2f} (1.0 = perfect)")
+        log.info("🏆 Overall Performance: %.2f (1.0 = perfect)", avg_accuracy)
         return avg_accuracy
     
     def _calculate_accuracy(self, activated, expected):
@@ -196,18 +999,19 @@ class PerceptionTrainer:
         Simple accuracy calculation - did we get the right answer?
         
         Args:
-            activated (list): What the AI found
+            activated (iterable): What the AI found, best match first
             expected (list): What we expected it to find
             
         Returns:
             float: 1.0 if correct, 0.0 if wrong
         """
-        if not activated:
+        # Only the best result matters, so don't read any further
+        top = next(iter(activated), None)
+        if top is None:
             return 0.0  # No results = wrong
         
         # Check if the best result is what we expected
-        top_result = activated[0]['bundle_id']
-        return 1.0 if top_result in expected else 0.0
+        return 1.0 if top['bundle_id'] in expected else 0.0
 
 
 def create_synthetic_data():
@@ -278,18 +1082,22 @@ def main():
     Main function that runs the entire demonstration.
     This is like the control center that coordinates everything.
     """
+    # Show the store/trainer progress messages (use logging.DEBUG for every
+    # single memory and search)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("🚀 Starting Neo4j Perceptron Algorithm Demo")
     print("=" * 50)
     
-    # Step 1: Setup the brain storage system
-    store = PerceptionStore("bolt://localhost:7687", ("neo4j", "password"))
-    trainer = PerceptionTrainer(store)
-    
+    store = None
     try:
+        # Step 1: Setup the brain storage system
+        store = PerceptionStore("bolt://localhost:7687", ("neo4j", "password"))
+        trainer = PerceptionTrainer(store)
+        
         # Step 2: Clear any old memories (fresh start)
         print("🧹 Clearing old memories...")
-        with store.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+        store.clear()
         print("✅ Brain cleared!")
         
         # Step 3: Create training and test data
@@ -307,6 +1115,7 @@ def main():
         # Step 6: Show brain statistics
         print("\n" + "=" * 50)
         print("📈 Brain Statistics:")
+        store.flush_activations()   # Make sure all activation counts are saved
         with store.driver.session() as session:
             stats = session.run("""
                 MATCH (n:Perception) 
@@ -331,8 +1140,9 @@ def main():
         print("💡 Make sure Neo4j is running and credentials are correct")
     
     finally:
-        # Always close the connection
-        store.close()
+        # Always close the connection (if we got as far as opening it)
+        if store is not None:
+            store.close()
         print("👋 Goodbye!")
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+"""
+Check the search kernels against plain numpy.
+
+Each kernel must find the same rows, in the same order, as sorting
+E @ q by hand. The numba kernels are only tested when numba is
+installed; the numpy code that runs without it is always tested.
+
+Run with: python -m pytest perceptron
+"""
+
+import numpy as np
+import pytest
+
+import _kernels
+
+K = 5
+
+needs_numba = pytest.mark.skipif(_kernels.njit is None, reason="numba is not installed")
+
+
+@pytest.fixture
+def numpy_only(monkeypatch):
+    # Force the numpy int8 path, in blocks small enough to need several
+    monkeypatch.setattr(_kernels, "_dots_int8", None)
+    monkeypatch.setattr(_kernels, "_BLOCK", 64)
+
+
+def _random_rows(n, dim, seed=0):
+    # Unit-length rows, like the normalized embeddings the store keeps
+    rows = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _expected(E, q, k=K):
+    # Brute force: score every row and sort
+    sims = E @ q
+    rows = np.argsort(-sims)[:k]
+    return rows.tolist(), sims[rows]
+
+
+@needs_numba
+@pytest.mark.parametrize("dim", [3, 16, 64, 100])
+def test_dots(dim):
+    E = _random_rows(200, dim)
+    q = _random_rows(1, dim, seed=1)[0]
+    np.testing.assert_allclose(_kernels._dots(E, q), E @ q, rtol=1e-4, atol=1e-5)
+
+
+@needs_numba
+@pytest.mark.parametrize("dim", [3, 16, 64, 100])
+def test_make_dot_kernel(dim):
+    # dim <= 64 gets the written-out loop, bigger sizes the plain one
+    E = _random_rows(200, dim)
+    q = _random_rows(1, dim, seed=1)[0]
+    dots = _kernels.make_dot_kernel(dim)
+    np.testing.assert_allclose(dots(E, q), E @ q, rtol=1e-4, atol=1e-5)
+
+    rows, scores = _kernels.topk_dot(E, q, K, -1.0, dots)
+    expected_rows, expected_scores = _expected(E, q)
+    assert rows == expected_rows
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-4, atol=1e-5)
+
+
+@needs_numba
+@pytest.mark.parametrize("dim", [3, 100])
+def test_dots_int8(dim):
+    Eq, _ = _kernels.quantize_rows(_random_rows(200, dim))
+    qq, _ = _kernels.quantize_rows(_random_rows(1, dim, seed=1))
+    expected = Eq.astype(np.int64) @ qq[0].astype(np.int64)
+    np.testing.assert_array_equal(_kernels._dots_int8(Eq, qq[0]), expected)
+
+
+def test_topk_dot():
+    E = _random_rows(200, 16)
+    q = _random_rows(1, 16, seed=1)[0]
+    rows, scores = _kernels.topk_dot(E, q, K, -1.0)
+    expected_rows, expected_scores = _expected(E, q)
+    assert rows == expected_rows
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_topk_dot_threshold():
+    E = _random_rows(200, 16)
+    q = E[7]
+    rows, scores = _kernels.topk_dot(E, q, K, 0.99, _kernels.make_dot_kernel(16))
+    assert rows == [7]
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_topk_dot_fewer_rows_than_k():
+    E = _random_rows(3, 16)
+    rows, _ = _kernels.topk_dot(E, E[1], K, -1.0)
+    assert rows == _expected(E, E[1])[0]
+    assert _kernels.topk_dot(E[:0], E[1], K, -1.0) == ([], [])
+
+
+def test_quantize_rows():
+    E = _random_rows(50, 16)
+    E[3] = 0.0
+    Eq, scale = _kernels.quantize_rows(E)
+    assert Eq.dtype == np.int8 and scale.dtype == np.float32
+    assert np.abs(Eq).max() == 127
+    assert not Eq[3].any()
+    np.testing.assert_allclose(Eq * scale[:, None], E, atol=scale.max())
+
+
+def _check_topk_dot_int8(dim):
+    E = _random_rows(200, dim)
+    q = _random_rows(1, dim, seed=1)[0]
+    Eq, scale = _kernels.quantize_rows(E)
+    rows, scores = _kernels.topk_dot_int8(Eq, scale, q, K, -1.0)
+
+    # Compared with the rows as stored, so rounding can't reorder them
+    expected_rows, _ = _expected(Eq * scale[:, None], q)
+    assert rows == expected_rows
+    np.testing.assert_allclose(scores, (E @ q)[rows], atol=0.02)
+
+
+@needs_numba
+@pytest.mark.parametrize("dim", [3, 100])
+def test_topk_dot_int8(dim):
+    _check_topk_dot_int8(dim)
+
+
+@pytest.mark.parametrize("dim", [3, 100])
+def test_topk_dot_int8_numpy(numpy_only, dim):
+    _check_topk_dot_int8(dim)
+
+
+def test_int8_numpy_matches_numba():
+    if _kernels.njit is None:
+        pytest.skip("numba is not installed")
+    Eq, scale = _kernels.quantize_rows(_random_rows(200, 16))
+    q = _random_rows(1, 16, seed=1)[0]
+    with_numba = _kernels._int8_scores(Eq, scale, q)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(_kernels, "_dots_int8", None)
+        mp.setattr(_kernels, "_BLOCK", 64)
+        without = _kernels._int8_scores(Eq, scale, q)
+    np.testing.assert_array_equal(with_numba, without)
+
+
+def test_select_batch():
+    S = np.array([[0.1, 0.9, 0.5, 0.7],
+                  [0.2, 0.1, 0.3, 0.0]], dtype=np.float32)
+    assert _kernels._select_batch(S, 2, 0.4) == [
+        ([1, 3], [pytest.approx(0.9), pytest.approx(0.7)]),
+        ([], []),
+    ]
+    # k bigger than the number of memories
+    assert _kernels._select_batch(S, 10, 0.15)[1][0] == [2, 0]
+
+
+def _check_batch_matches_single():
+    E = _random_rows(200, 16)
+    Q = _random_rows(10, 16, seed=1)
+    Eq, scale = _kernels.quantize_rows(E)
+    dots = _kernels.make_dot_kernel(16)
+
+    for q, (rows, scores) in zip(Q, _kernels.topk_dot_batch(E, Q, K, -1.0)):
+        single_rows, single_scores = _kernels.topk_dot(E, q, K, -1.0, dots)
+        assert rows == single_rows
+        np.testing.assert_allclose(scores, single_scores, rtol=1e-5)
+    for q, (rows, scores) in zip(Q, _kernels.topk_dot_int8_batch(Eq, scale, Q, K, -1.0)):
+        # Same numbers, so the same scores exactly
+        assert (rows, scores) == _kernels.topk_dot_int8(Eq, scale, q, K, -1.0)
+
+
+def test_batch_matches_single():
+    _check_batch_matches_single()
+
+
+def test_batch_matches_single_numpy(numpy_only):
+    _check_batch_matches_single()
@@ -0,0 +1,165 @@
+"""
+Check the in-process side of PerceptionStore without a Neo4j server.
+
+The driver is replaced by a stub that answers every query with an empty
+graph, so only the in-process copy is exercised: adding rows, the search
+cache and the cache file.
+
+Run with: python -m pytest perceptron
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("neo4j")
+
+import neo4j_perceptron  # noqa: E402
+
+
+class _StubTx:
+    def run(self, cypher, params=None):
+        # Counting queries see an empty graph, everything else returns nothing
+        return _StubResult([{'n': 0}] if 'count(' in cypher else [])
+
+    def close(self):
+        pass
+
+
+class _StubResult(list):
+    def consume(self):
+        pass
+
+
+class _StubSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def close(self):
+        pass
+
+    def begin_transaction(self):
+        return _StubTx()
+
+    def execute_read(self, fn, *args, **kwargs):
+        return fn(_StubTx(), *args, **kwargs)
+
+    execute_write = execute_read
+
+
+class _StubDriver:
+    def session(self, **kwargs):
+        return _StubSession()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_store(monkeypatch):
+    monkeypatch.setattr(neo4j_perceptron.GraphDatabase, "driver",
+                        lambda *args, **kwargs: _StubDriver())
+    stores = []
+
+    def make(**kwargs):
+        store = neo4j_perceptron.PerceptionStore("bolt://stub", ("neo4j", "test"), **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def _unit(vector):
+    return neo4j_perceptron._normalize(vector)
+
+
+def _top(store, query):
+    return [bundle_id for bundle_id, _ in store._search(_unit(query))]
+
+
+def test_remember_skips_known_ids(make_store):
+    store = make_store()
+    store._remember_embeddings(['a', 'b'], [_unit([1, 0, 0]), _unit([0, 1, 0])])
+    store._remember_embeddings(['b', 'c'], [_unit([0, 0, 1]), _unit([1, 1, 0])])
+
+    assert store._ids == ['a', 'b', 'c']
+    assert store._n == 3
+    assert store._rows == {'a': 0, 'b': 1, 'c': 2}
+    # 'b' kept its first embedding
+    np.testing.assert_allclose(store._E[1], [0, 1, 0])
+
+
+def test_matrix_grows(make_store):
+    store = make_store()
+    rng = np.random.default_rng(0)
+    vectors = [_unit(v) for v in rng.standard_normal((150, 8))]
+    for i, vector in enumerate(vectors):
+        store._remember_embeddings([f'm{i}'], [vector])
+
+    assert store._n == 150
+    assert store._E.shape[0] >= 150
+    for i in (0, 63, 64, 149):
+        assert _top(store, vectors[i])[0] == f'm{i}'
+
+
+def test_search_cache_evicts_oldest(make_store):
+    store = make_store()
+    store._search_cache_size = 2
+    store._remember_embeddings(['a', 'b', 'c'],
+                               [_unit([1, 0, 0]), _unit([0, 1, 0]), _unit([0, 0, 1])])
+
+    _top(store, [1, 0, 0])
+    _top(store, [0, 1, 0])
+    _top(store, [1, 0, 0])   # Used again, so [0, 1, 0] is now the oldest
+    _top(store, [0, 0, 1])
+
+    keys = list(store._search_cache)
+    fingerprint = neo4j_perceptron._fingerprint
+    assert keys == [fingerprint(_unit([1, 0, 0])), fingerprint(_unit([0, 0, 1]))]
+
+
+def test_search_cache_cleared_by_new_memories(make_store):
+    store = make_store()
+    store._remember_embeddings(['a'], [_unit([1, 0, 0])])
+    assert _top(store, [1, 1, 0]) == ['a']
+    assert store._search_cache
+
+    store._remember_embeddings(['ab'], [_unit([1, 1, 0])])
+    assert not store._search_cache
+    assert _top(store, [1, 1, 0]) == ['ab', 'a']
+
+
+def test_single_and_batch_scores_match(make_store):
+    store = make_store()
+    store._remember_embeddings(['a', 'b'], [_unit([0.9, 0.1, 0.8]), _unit([0.8, 0.2, 0.9])])
+    query = [0.85, 0.15, 0.85]
+    single = list(store.activate_perceptions(query))
+    batch = store.activate_perceptions_batch([query])[0]
+    assert [m['bundle_id'] for m in single] == [m['bundle_id'] for m in batch]
+    assert [m['similarity'] for m in single] == pytest.approx([m['similarity'] for m in batch])
+    assert store.activate_perceptions_batch([]) == []
+
+
+@pytest.mark.parametrize("saved_quantized, load_quantized", [(False, True), (True, False)])
+def test_cache_converted_to_quantize_setting(make_store, tmp_path,
+                                             saved_quantized, load_quantized):
+    cache_path = str(tmp_path / "memories.cache")   # No .npz on purpose
+    first = make_store(cache_path=cache_path, quantize=saved_quantized)
+    first._remember_embeddings(['a', 'b'], [_unit([1, 0, 0]), _unit([0, 1, 1])])
+    first.save_cache()
+
+    store = make_store(cache_path=cache_path, quantize=load_quantized)
+    assert store._ids == ['a', 'b']
+    if load_quantized:
+        assert store._E.dtype == np.int8 and store._scale is not None
+    else:
+        assert store._E.dtype == np.float32 and store._scale is None
+    assert _top(store, [0, 1, 1])[0] == 'b'
+
+    # Storing and searching keep working on the converted copy
+    store._remember_embeddings(['c'], [_unit([0, 0, 1])])
+    assert _top(store, [0, 0, 1])[0] == 'c'